@@ -0,0 +1,234 @@
+import hashlib
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+from data_shared import shared_frame
+
+try:
+    import pyarrow  # noqa: F401 (necesario para Feather)
+    CACHE_ENABLED = True
+except ImportError:
+    CACHE_ENABLED = False
+
+cache_dir = "./data/cache/"
+
+# Tipos fijos para que todas las redes tengan las mismas columnas al concatenarlas
+COLUMN_TYPES = {
+    "subcluster": "int64",
+    "module_size": "int64",
+    "module_membership": "float64",
+    "percentile": "float64",
+    "cluster": "int64",
+    "length_intersection": "int64",
+    "subgraph_size": "int64",
+    "p_value": "float64",
+    "IC": "float64",
+    "cutoff": "int64",
+    "correlation": "float64",
+}
+
+
+def file_hash(file_path):
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as handle:
+        for chunk in iter(lambda: handle.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def cache_paths(csv_path):
+    # "./data/APP_ROSMAP_TGCNs_modules.csv" -> "data__APP_ROSMAP_TGCNs_modules"
+    name = os.path.splitext(os.path.normpath(csv_path))[0].replace(os.sep, "__").lstrip("._")
+    base = os.path.join(cache_dir, name)
+    return base + ".feather", base + ".json"
+
+def apply_column_types(df):
+    for col, dtype in COLUMN_TYPES.items():
+        if col in df.columns and str(df[col].dtype) != dtype:
+            try:
+                df[col] = df[col].astype(dtype)
+            except (ValueError, TypeError):
+                pass
+    return df
+
+def read_meta(meta_path):
+    try:
+        with open(meta_path) as handle:
+            return json.load(handle)
+    except (OSError, ValueError):
+        return None
+
+def write_atomic(path, write):
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    write(tmp_path)
+    os.replace(tmp_path, path)
+
+def write_meta(meta_path, meta):
+    def write(path):
+        with open(path, "w") as handle:
+            json.dump(meta, handle)
+    write_atomic(meta_path, write)
+
+def cache_is_valid(csv_path, stat, meta, feather_path):
+    if meta is None or not os.path.exists(feather_path):
+        return False
+    if meta["mtime_ns"] == stat.st_mtime_ns and meta["size"] == stat.st_size:
+        return True
+    # El mtime ha cambiado (p.ej. tras un checkout): solo invalidamos si cambia el contenido
+    return meta["size"] == stat.st_size and meta["sha256"] == file_hash(csv_path)
+
+def store(csv_path, stat, df, feather_path, meta_path):
+    os.makedirs(cache_dir, exist_ok=True)
+    write_atomic(feather_path, lambda path: df.to_feather(path))
+    meta = {
+        "source": csv_path,
+        "mtime_ns": stat.st_mtime_ns,
+        "size": stat.st_size,
+        "sha256": file_hash(csv_path),
+    }
+    write_meta(meta_path, meta)
+
+def read_csv_cached(csv_path):
+    # Lee un CSV a través de la caché columnar; solo se parsea el texto si la caché no es válida
+    if not os.path.exists(csv_path):
+        return None
+    if not CACHE_ENABLED:
+        return apply_column_types(pd.read_csv(csv_path))
+
+    stat = os.stat(csv_path)
+    feather_path, meta_path = cache_paths(csv_path)
+    meta = read_meta(meta_path)
+    if cache_is_valid(csv_path, stat, meta, feather_path):
+        try:
+            df = pd.read_feather(feather_path)
+            if meta["mtime_ns"] != stat.st_mtime_ns:
+                write_meta(meta_path, dict(meta, mtime_ns=stat.st_mtime_ns))
+            return df
+        except (OSError, ValueError) as e:
+            print(f"Error reading cache for {csv_path}: {e}")
+
+    df = apply_column_types(pd.read_csv(csv_path))
+    try:
+        store(csv_path, stat, df, feather_path, meta_path)
+    except (OSError, ValueError) as e:
+        print(f"Error writing cache for {csv_path}: {e}")
+    return df
+
+
+# Predicciones: miles de predict_<GEN>.csv empaquetados en una sola tabla ordenada por gen
+PREDICT_GENE_COLUMNS = ["MM", "MM_percentile"]
+
+
+def predict_files(predicts_dir):
+    # {gen: DirEntry} a partir de los nombres predict_<GEN>.csv
+    files = {}
+    if os.path.isdir(predicts_dir):
+        for entry in os.scandir(predicts_dir):
+            if entry.name.startswith("predict_") and entry.name.endswith(".csv"):
+                files[entry.name[len("predict_"):-len(".csv")]] = entry
+    return files
+
+def predicts_signature(files):
+    digest = hashlib.sha256()
+    for gene in sorted(files):
+        stat = files[gene].stat()
+        digest.update(f"{gene}:{stat.st_size}:{stat.st_mtime_ns};".encode())
+    return digest.hexdigest()
+
+def normalize_predict_columns(gene, df):
+    # "SNCA_MM" -> "MM", "SNCA_MM_percentile" -> "MM_percentile"
+    return df.rename(columns={f"{gene}_{col}": col for col in PREDICT_GENE_COLUMNS})
+
+def pack_predicts(files):
+    frames = []
+    index = {}
+    start = 0
+    for gene in sorted(files):
+        df = normalize_predict_columns(gene, pd.read_csv(files[gene].path))
+        int_columns = [col for col in df.columns if str(df[col].dtype) == "int64"]
+        index[gene] = [start, start + len(df), int_columns]
+        start += len(df)
+        df.insert(0, "gene", gene)
+        frames.append(df)
+    table = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(columns=["gene"])
+    # Columnas de texto con algún fichero vacío (todo NaN) quedan como object
+    for col in table.columns:
+        if table[col].dtype == object:
+            table[col] = table[col].where(table[col].isna(), table[col].astype(str))
+    return table, index
+
+
+class PredictStore:
+    # Tabla única de predicciones con índice gen -> [inicio, fin, columnas enteras]
+
+    def __init__(self, table, index, signature=None):
+        self.table = table
+        self.index = index
+        self.signature = signature
+
+    @property
+    def genes(self):
+        return list(self.index)
+
+    def get(self, gene):
+        entry = self.index.get(gene)
+        if entry is None:
+            return None
+        start, stop, int_columns = entry
+        df = self.table.iloc[start:stop].drop(columns="gene").reset_index(drop=True)
+        for col in int_columns:
+            df[col] = df[col].astype("int64")
+        # El texto de la tabla compartida son categorías; solo se decodifican las filas del gen
+        for col in df.columns[df.dtypes == "category"]:
+            df[col] = df[col].astype(object)
+        return df.rename(columns={col: f"{gene}_{col}" for col in PREDICT_GENE_COLUMNS})
+
+
+def load_predict_store(predicts_dir):
+    files = predict_files(predicts_dir)
+    signature = predicts_signature(files)
+    name = "predicts__" + os.path.basename(os.path.normpath(predicts_dir))
+    table_path = os.path.join(cache_dir, name + ".feather")
+    index_path = os.path.join(cache_dir, name + ".json")
+
+    def read_table():
+        table = pd.read_feather(table_path)
+        # Feather devuelve None en los huecos de texto; el CSV original da NaN
+        for col in table.columns[table.dtypes == object]:
+            table[col] = table[col].fillna(np.nan)
+        return table
+
+    if CACHE_ENABLED:
+        meta = read_meta(index_path)
+        if meta is not None and meta["signature"] == signature and os.path.exists(table_path):
+            try:
+                return PredictStore(shared_frame(name, signature, read_table), meta["index"], signature)
+            except (OSError, ValueError) as e:
+                print(f"Error reading cache for {predicts_dir}: {e}")
+
+    table, index = pack_predicts(files)
+    if CACHE_ENABLED:
+        try:
+            os.makedirs(cache_dir, exist_ok=True)
+            write_atomic(table_path, lambda path: table.to_feather(path))
+            write_meta(index_path, {"source": predicts_dir, "signature": signature, "index": index})
+        except (OSError, ValueError) as e:
+            print(f"Error writing cache for {predicts_dir}: {e}")
+    return PredictStore(shared_frame(name, signature, lambda: table), index, signature)
+
+def ingest(paths, predicts_dirs=()):
+    # Convierte todos los CSV a Feather de antemano (python code/data_cache.py desde la raíz del repo)
+    for csv_path in paths:
+        df = read_csv_cached(csv_path)
+        print(f"{csv_path}: {'missing' if df is None else f'{len(df)} rows'}")
+    for predicts_dir in predicts_dirs:
+        store = load_predict_store(predicts_dir)
+        print(f"{predicts_dir}: {len(store.index)} genes, {len(store.table)} rows")
+
+
+if __name__ == "__main__":
+    import data_registry
+
+    ingest(data_registry.source_files(), data_registry.predicts_dirs.values())
@@ -0,0 +1,134 @@
+import gzip
+import os
+import zlib
+
+from data_shared import sources_signature
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# Compresión de las respuestas según Accept-Encoding (br si está instalado brotli, si no gzip).
+# Las páginas y descargas se comprimen al vuelo; los .js de static se comprimen una vez y se
+# sirven ya comprimidos desde la caché.
+static_cache_dir = "./data/cache/static/"
+
+COMPRESSIBLE_TYPES = ("text/", "application/json", "application/javascript")
+# Extensión de los ficheros precomprimidos de cada codificación
+ENCODING_SUFFIXES = {"br": ".br", "gzip": ".gz"}
+
+
+def available_encodings():
+    return ["br", "gzip"] if brotli is not None else ["gzip"]
+
+def negotiate_encoding(accept_encodings):
+    # accept_encodings: request.accept_encodings; la primera aceptada en orden de preferencia
+    for encoding in available_encodings():
+        if accept_encodings.quality(encoding) > 0:
+            return encoding
+    return None
+
+def compressor(encoding, level):
+    # Objeto con compress(chunk) y flush() para comprimir por trozos
+    if encoding == "br":
+        return BrotliStream(level)
+    return zlib.compressobj(level, zlib.DEFLATED, 31)  # wbits=31: cabecera y cola gzip
+
+def compress_bytes(data, encoding, level):
+    stream = compressor(encoding, level)
+    return stream.compress(data) + stream.flush()
+
+def compress_chunks(chunks, encoding, level):
+    # Codificador en streaming: cada trozo se comprime y se envía sin esperar al resto
+    stream = compressor(encoding, level)
+    for chunk in chunks:
+        compressed = stream.compress(chunk)
+        if compressed:
+            yield compressed
+    yield stream.flush()
+
+
+class BrotliStream:
+    # Misma interfaz que zlib.compressobj para el compresor de brotli
+
+    def __init__(self, level):
+        # Calidad 0-11 de brotli a partir del nivel 1-9 de gzip
+        self.compressor = brotli.Compressor(quality=min(max(level - 2, 0), 11))
+
+    def compress(self, data):
+        return self.compressor.process(data)
+
+    def flush(self):
+        return self.compressor.finish()
+
+
+class ResponseCompressor:
+    # after_request: comprime las respuestas de tipo texto de al menos min_size bytes
+
+    def __init__(self, min_size=1024, level=6):
+        self.min_size = min_size
+        self.level = level
+
+    def __call__(self, response, request):
+        if not self.compressible(response):
+            return response
+        response.vary.add("Accept-Encoding")
+        encoding = negotiate_encoding(request.accept_encodings)
+        if encoding is None or request.method == "HEAD":
+            return response
+
+        if response.is_streamed:
+            # Tamaño desconocido: se comprime por trozos y sin Content-Length
+            response.response = compress_chunks(response.iter_encoded(), encoding, self.level)
+            response.headers.pop("Content-Length", None)
+        else:
+            data = response.get_data()
+            if len(data) < self.min_size:
+                return response
+            response.set_data(compress_bytes(data, encoding, self.level))
+        response.headers["Content-Encoding"] = encoding
+        # La representación comprimida no es idéntica byte a byte: el ETag pasa a débil
+        etag, weak = response.get_etag()
+        if etag and not weak:
+            response.set_etag(etag, weak=True)
+        return response
+
+    def compressible(self, response):
+        content_type = response.mimetype or ""
+        return (response.status_code not in (204, 206, 304)
+                and not response.direct_passthrough
+                and "Content-Encoding" not in response.headers
+                and content_type.startswith(COMPRESSIBLE_TYPES))
+
+
+def precompressed_path(path, encoding):
+    # Variante comprimida de un fichero estático; el nombre cambia con el fichero original
+    # (ruta absoluta: send_file resuelve las relativas respecto a la aplicación)
+    name = f"{os.path.basename(path)}-{sources_signature([path])[:16]}{ENCODING_SUFFIXES[encoding]}"
+    return os.path.abspath(os.path.join(static_cache_dir, name))
+
+def precompress_static(static_dir, suffixes=(".js",)):
+    # Genera las variantes que falten; se escriben a un temporal para no servir ficheros a medias
+    created = []
+    for name in sorted(os.listdir(static_dir)):
+        path = os.path.join(static_dir, name)
+        if not name.endswith(suffixes) or not os.path.isfile(path):
+            continue
+        for encoding in available_encodings():
+            target = precompressed_path(path, encoding)
+            if os.path.exists(target):
+                continue
+            os.makedirs(static_cache_dir, exist_ok=True)
+            with open(path, "rb") as handle:
+                data = handle.read()
+            if encoding == "br":
+                data = brotli.compress(data, quality=11)
+            else:
+                data = gzip.compress(data, compresslevel=9, mtime=0)
+            tmp_path = f"{target}.{os.getpid()}.tmp"
+            with open(tmp_path, "wb") as handle:
+                handle.write(data)
+            os.replace(tmp_path, target)
+            created.append(target)
+    return created
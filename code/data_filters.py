@@ -0,0 +1,140 @@
+import re
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+# Motor de filtros común a todas las consultas y descargas: los parámetros del formulario se
+# compilan en una lista de filtros y se evalúan como una máscara booleana sobre el frame
+# antes de construir ningún resultado.
+Filter = namedtuple("Filter", ["column", "kind", "values"])
+
+# Parámetro del formulario -> (columna, tipo de filtro)
+#   cell_type: lista separada por comas, sin distinguir mayúsculas y con "_" como espacio
+#   in:        lista separada por comas, comparando el valor como texto
+#   min:       umbral numérico (>=)
+#   contains:  expresión buscada dentro del valor, sin distinguir mayúsculas
+#   term:      término exacto sin distinguir mayúsculas en cualquiera de las columnas (tupla)
+SCRNA_MODULE_FILTERS = {
+    "cell_type_filter": ("cell_type", "cell_type"),
+    "iteration_filter": ("iteration", "in"),
+    "cluster_filter": ("subcluster", "in"),
+    "module_filter": ("module", "in"),
+    "percentile_filter": ("percentile", "min"),
+}
+SCRNA_ANNOTATION_FILTERS = {
+    "cell_type_filter": ("cell_type", "cell_type"),
+    "iteration_filter": ("iteration", "in"),
+    "cluster_filter": ("cluster", "in"),
+    "module_filter": ("module", "in"),
+}
+BULK_FILTERS = {
+    "target_filter": ("target", "in"),
+    "tissue_filter": ("tissue", "in"),
+    "cutoff_filter": ("cutoff", "in"),
+    "module_filter": ("module", "in"),
+    "min_correlation": ("correlation", "min"),
+}
+# Redes bulk en las que se buscan funciones nuevas; sin parámetros, las del estudio original
+BULK_NEW_FUNCTION_FILTERS = {
+    "cutoff_filter": ("cutoff", "in"),
+    "target_filter": ("target", "in"),
+    "tissue_filter": ("tissue", "in"),
+    "phenotype_filter": ("phenotype", "in"),
+}
+BULK_NEW_FUNCTION_DEFAULTS = {
+    "cutoff_filter": "10",
+    "target_filter": "APP",
+    "tissue_filter": "DLPFC",
+    "phenotype_filter": "AD",
+}
+# Búsqueda de un término GO por id o por nombre; se añade a los filtros de cada fuente
+TERM_FILTERS = {
+    "search_term": (("term_id", "term_name"), "term"),
+}
+PREDICT_FILTERS = {
+    "cell_type_filter": ("tipo_celular", "contains"),
+}
+
+
+
+class FilterError(ValueError):
+    # Parámetro de filtro que no se puede compilar (número o expresión no válidos): la API responde 400
+    pass
+
+
+def normalize_cell_type(value):
+    return str(value).replace("_", " ").strip().lower()
+
+def compile_filters(params, fields):
+    # params: request.form o cualquier dict; los parámetros vacíos no filtran
+    filters = []
+    for param, (column, kind) in fields.items():
+        raw = (params.get(param) or "").strip()
+        if not raw:
+            continue
+        try:
+            if kind == "min":
+                values = float(raw)
+            elif kind == "contains":
+                values = re.compile(raw, flags=re.IGNORECASE)
+            elif kind == "term":
+                values = raw.lower()
+            elif kind == "cell_type":
+                values = {normalize_cell_type(value) for value in raw.split(",")}
+            else:
+                values = {value.strip() for value in raw.split(",")}
+        except (ValueError, re.error):
+            raise FilterError(f"Invalid value for {param}: {raw}")
+        filters.append(Filter(column, kind, values))
+    return filters
+
+def filter_values(filters, column):
+    # Valor compilado del filtro sobre column (p.ej. el umbral de un "min") o None si no se filtra
+    for filter in filters:
+        if filter.column == column:
+            return filter.values
+    return None
+
+def value_mask(series, accept):
+    # Evalúa accept una vez por valor distinto (las categorías ya vienen codificadas)
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        codes, uniques = series.cat.codes.to_numpy(), series.cat.categories
+    else:
+        codes, uniques = pd.factorize(series)
+    accepted = np.fromiter((accept(value) for value in uniques), dtype=bool, count=len(uniques))
+    # El código -1 (NaN) cae en la última posición, que nunca se acepta
+    return np.append(accepted, False)[codes]
+
+def term_mask(df, columns, term):
+    # Filas en las que alguna de las columnas vale term (ya en minúsculas)
+    mask = np.zeros(len(df), dtype=bool)
+    for column in columns:
+        if column in df.columns:
+            mask |= value_mask(df[column], lambda value: isinstance(value, str) and value.lower() == term)
+    return mask
+
+def filter_mask(df, filters):
+    mask = np.ones(len(df), dtype=bool)
+    for column, kind, values in filters:
+        if kind == "term":
+            mask &= term_mask(df, column, values)
+            continue
+        if column not in df.columns:
+            continue
+        series = df[column]
+        if kind == "min":
+            mask &= pd.to_numeric(series, errors="coerce").to_numpy() >= values
+        elif kind == "contains":
+            mask &= value_mask(series, lambda value: isinstance(value, str) and values.search(value) is not None)
+        elif kind == "cell_type":
+            mask &= value_mask(series, lambda value: normalize_cell_type(value) in values)
+        else:
+            mask &= value_mask(series, lambda value: str(value) in values)
+    return mask
+
+def apply_filters(df, filters):
+    if not filters or df is None:
+        return df
+    return df[filter_mask(df, filters)]
+
@@ -0,0 +1,110 @@
+import numpy as np
+import pandas as pd
+
+from data_cache import normalize_predict_columns
+
+# Estadísticas de cabecera de las páginas de cada gen (gene_functions y new_gene_functions),
+# calculadas de una vez para todos los genes al cargar los datos: una fila por gen.
+
+
+def parse_ic(values):
+    # "3.20 (2.83-3.58)" -> 3.20; "NA (NA-NA)", vacíos y texto no numérico -> NaN
+    return pd.to_numeric(pd.Series(values).astype(str).str.split("(").str[0].str.strip(), errors="coerce")
+
+def module_stats(modules):
+    # Media de module membership y percentil con la primera aparición del gen en cada red
+    first = modules.drop_duplicates(["gene", "network"])
+    stats = first.groupby("gene", observed=True, sort=False)[["module_membership", "percentile"]].mean()
+    return stats.rename(columns={"module_membership": "mean_mm", "percentile": "mean_percentile"})
+
+def annotation_stats(annotations, gene_ids, n_genes, replacement_ic):
+    # annotations: filas de anotación alineadas con gene_ids (el gen de cada fila).
+    # Número de anotaciones, pares (cell_type, cluster) distintos e IC medio por gen.
+    annotation_count = np.bincount(gene_ids, minlength=n_genes)
+    ic = pd.to_numeric(annotations["IC"], errors="coerce").to_numpy(dtype=float)
+    ic = np.where(np.isposinf(ic), replacement_ic, ic)
+    ic_sum = np.bincount(gene_ids, weights=ic, minlength=n_genes)
+    groups = annotations.groupby(["cell_type", "cluster"], observed=True, sort=False).ngroup().to_numpy()
+    valid = groups >= 0
+    n_groups = max(int(groups.max()) + 1, 1) if len(groups) else 1
+    pairs = np.unique(gene_ids[valid].astype(np.int64) * n_groups + groups[valid])
+    group_count = np.bincount(pairs // n_groups, minlength=n_genes)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return pd.DataFrame({
+            "annotations": annotation_count,
+            "annotation_groups": group_count,
+            "mean_annotations": np.where(group_count > 0, annotation_count / np.maximum(group_count, 1), 0.0),
+            "mean_ic": np.where(annotation_count > 0, ic_sum / np.maximum(annotation_count, 1), np.nan),
+        })
+
+def predict_stats(table):
+    # table: predicciones con columna "gene" y MM/MM_percentile sin prefijo (PredictStore.table).
+    # Solo cuentan las filas con módulo (module_size no vacío).
+    rows = table[table["module_size"].notna()]
+    known = rows["known_annotations"]
+    new = rows["new_annotations"]
+    with np.errstate(invalid="ignore", divide="ignore"):
+        participation = known / (known + new) * 100
+    frame = pd.DataFrame({
+        "gene": rows["gene"].to_numpy(),
+        "predict_mean_mm": rows["MM"].to_numpy(),
+        "predict_mean_percentile": rows["MM_percentile"].to_numpy(),
+        "mean_known_annotations": known.to_numpy(dtype=float),
+        "mean_new_annotations": new.to_numpy(dtype=float),
+        "mean_new_percentage": rows["new_percentage"].to_numpy(dtype=float),
+        "mean_participation_percentage": participation.to_numpy(dtype=float),
+        "mean_known_ic": parse_ic(rows["IC known(CI95%)"]).to_numpy(),
+        "mean_new_ic": parse_ic(rows["IC new(CI95%)"]).to_numpy(),
+    })
+    grouped = frame.groupby("gene", observed=True, sort=False)
+    stats = grouped.mean()
+    stats.insert(0, "predict_modules", grouped.size())
+    return stats
+
+def gene_predict_stats(gene, df):
+    # Las mismas estadísticas para un subconjunto de predicciones de un gen (p.ej. filtrado)
+    df = normalize_predict_columns(gene, df).assign(gene=gene)
+    stats = predict_stats(df)
+    if stats.empty:
+        return None
+    return stats.iloc[0].to_dict()
+
+def build_gene_stats(registry):
+    index = registry.intersection_index
+    frames = [module_stats(registry.modules)]
+
+    if registry.annotations is not None:
+        gene_ids = np.repeat(np.arange(len(index.genes)), np.diff(index.gene_offsets))
+        columns = registry.annotations[["cell_type", "cluster", "IC"]].take(index.gene_rows)
+        stats = annotation_stats(columns, gene_ids, len(index.genes), registry.catalog.replacement_ic)
+        frames.append(stats.set_axis(pd.Index(index.genes, name="gene")))
+
+    store = registry.predicts.get("scRNA")
+    if store is not None and "module_size" in store.table.columns:
+        frames.append(predict_stats(store.table))
+
+    minimal = registry.minimally_expressed
+    if minimal is not None:
+        minimal = minimal.drop_duplicates("Gene").set_index("Gene")[["Statistic", "Percentage"]]
+        frames.append(minimal.rename(columns={"Statistic": "minimal_statistic", "Percentage": "minimal_percentage"}))
+
+    table = pd.concat(frames, axis=1, sort=True)
+    for column in ("annotations", "annotation_groups", "predict_modules"):
+        if column in table.columns:
+            table[column] = table[column].fillna(0).astype(np.int64)
+    table.index.name = "gene"
+    return table.reset_index()
+
+
+class GeneStats:
+    # Tabla gene_stats con acceso por gen: fila del gen como dict o None
+
+    def __init__(self, table):
+        self.table = table
+        self.positions = {gene: i for i, gene in enumerate(table["gene"])} if "gene" in table.columns else {}
+
+    def get(self, gene):
+        position = self.positions.get(gene)
+        if position is None:
+            return None
+        return self.table.iloc[position].to_dict()
@@ -0,0 +1,320 @@
+import sys
+from bisect import bisect_left
+
+import numpy as np
+import pandas as pd
+
+from data_results import top_k_order
+
+
+def build_gene_index(modules):
+    # gen -> posiciones (fila) en el frame concatenado de redes; la red de cada fila está en modules["network"]
+    if modules.empty:
+        return {}
+    return {gene: positions.astype(np.int64) for gene, positions in modules.groupby("gene", observed=True, sort=False).indices.items()}
+
+def split_intersection(intersections):
+    # "MLC1,HEPH" o "['MLC1', 'HEPH']" -> un token (en mayúsculas) por fila y gen
+    # (astype(object): la columna compartida es un Categorical, sin "" entre sus categorías)
+    tokens = (intersections.astype(object).fillna("").astype(str)
+              .str.replace(r"[\[\]'\"]", "", regex=True)
+              .str.upper()
+              .str.split(","))
+    tokens = tokens.explode().str.strip()
+    return tokens[tokens.notna() & (tokens != "")]
+
+class IntersectionIndex:
+    # Intersecciones en formato CSR con ids de gen int32 sobre un vocabulario ordenado:
+    #   genes de la fila r: genes[row_genes[row_offsets[r]:row_offsets[r + 1]]]
+    #   filas del gen g:    gene_rows[gene_offsets[g]:gene_offsets[g + 1]]
+
+    def __init__(self, intersections):
+        n_rows = len(intersections)
+        tokens = split_intersection(intersections.reset_index(drop=True))
+        codes, genes = pd.factorize(tokens, sort=True)
+        rows = tokens.index.to_numpy(dtype=np.int64)
+        # Un gen repetido en la misma intersección cuenta una vez
+        pairs = np.unique(codes.astype(np.int64) * max(n_rows, 1) + rows)
+        gene_ids, rows = np.divmod(pairs, max(n_rows, 1))
+
+        self.genes = np.array([sys.intern(gene) for gene in genes], dtype=object)
+        self.gene_ids = {gene: i for i, gene in enumerate(self.genes)}
+        self.gene_rows = rows.astype(np.int32)
+        self.gene_offsets = offsets(gene_ids, len(self.genes))
+        order = np.argsort(rows, kind="stable")
+        self.row_genes = gene_ids[order].astype(np.int32)
+        self.row_offsets = offsets(rows, n_rows)
+
+    def rows(self, gene):
+        # Filas cuya intersección contiene exactamente ese gen (ya normalizado)
+        gene_id = self.gene_ids.get(gene)
+        if gene_id is None:
+            return np.empty(0, dtype=np.int32)
+        return self.gene_rows[self.gene_offsets[gene_id]:self.gene_offsets[gene_id + 1]]
+
+    def row_gene_names(self, row):
+        return self.genes[self.row_genes[self.row_offsets[row]:self.row_offsets[row + 1]]]
+
+    @property
+    def nbytes(self):
+        return self.gene_rows.nbytes + self.gene_offsets.nbytes + self.row_genes.nbytes + self.row_offsets.nbytes
+
+def offsets(ids, size):
+    # Punteros CSR a partir de ids ordenados (o agrupados)
+    result = np.zeros(size + 1, dtype=np.int64)
+    np.cumsum(np.bincount(ids, minlength=size), out=result[1:])
+    return result
+
+def build_intersection_index(annotations):
+    if annotations is None or "intersection" not in annotations.columns:
+        return IntersectionIndex(pd.Series([], dtype=object))
+    return IntersectionIndex(annotations["intersection"])
+
+
+
+class GenePrefixIndex:
+    # Genes ordenados e internados para el autocompletado: los que empiezan por un prefijo
+    # forman un rango contiguo que se localiza con bisect, sin recorrer la lista entera.
+    # popularity: número de filas (gen en módulo) de cada gen en las redes
+
+    def __init__(self, gene_counts):
+        self.genes = [sys.intern(gene) for gene in sorted(gene_counts)]
+        self.popularity = np.array([gene_counts[gene] for gene in self.genes], dtype=np.int64)
+
+    def __len__(self):
+        return len(self.genes)
+
+    def prefix_range(self, prefix):
+        if not prefix:
+            return 0, len(self.genes)
+        return bisect_left(self.genes, prefix), bisect_left(self.genes, prefix[:-1] + chr(ord(prefix[-1]) + 1))
+
+    def complete(self, prefix, limit):
+        # Los limit primeros en orden alfabético
+        start, stop = self.prefix_range(prefix)
+        return self.genes[start:min(stop, start + limit)]
+
+    def popular(self, prefix, limit):
+        # Los limit más frecuentes; a igual frecuencia, en orden alfabético
+        start, stop = self.prefix_range(prefix)
+        order = top_k_order(-self.popularity[start:stop].astype(float), limit)
+        return [self.genes[start + i] for i in order]
+
+def build_gene_prefix_index(gene_index):
+    return GenePrefixIndex({gene: len(positions) for gene, positions in gene_index.items() if isinstance(gene, str)})
+
+# Columnas que identifican un módulo en las anotaciones de cada dataset
+MODULE_KEYS = ["cell_type", "iteration", "cluster", "module"]
+BULK_MODULE_KEYS = ["cutoff", "target", "tissue", "phenotype", "module"]
+# ...y un subgrafo de términos GO (mismo índice CSR, agrupado por subgrafo)
+SUBGRAPH_KEYS = ["subgraph_id"]
+
+def module_key(values):
+    # Clave hashable común a redes y anotaciones: números como int de Python, el resto como texto
+    return tuple(int(value) if isinstance(value, (int, float, np.integer, np.floating)) else str(value)
+                 for value in values)
+
+class ModuleAnnotationIndex:
+    # Anotaciones agrupadas por módulo en formato CSR:
+    #   clave del módulo (columnas de key_columns) -> rows[offsets[m]:offsets[m + 1]] (orden original)
+
+    def __init__(self, annotations, key_columns=MODULE_KEYS):
+        self.key_columns = list(key_columns)
+        if annotations is None or annotations.empty:
+            self.keys, self.rows, self.offsets = {}, np.empty(0, dtype=np.int32), np.zeros(1, dtype=np.int64)
+            return
+        groups = annotations.groupby(self.key_columns, observed=True, sort=False).ngroup().to_numpy()
+        n_groups = int(groups.max()) + 1 if len(groups) else 0
+        valid = np.flatnonzero(groups >= 0)
+        _, first_rows = np.unique(groups[valid], return_index=True)
+        first_rows = valid[first_rows]
+        values = [annotations[column].to_numpy()[first_rows] for column in self.key_columns]
+        self.keys = {module_key(key): group for group, key in enumerate(zip(*values))}
+        order = valid[np.argsort(groups[valid], kind="stable")]
+        self.rows = order.astype(np.int32)
+        self.offsets = offsets(groups[order], n_groups)
+
+    def get(self, *key):
+        group = self.keys.get(module_key(key))
+        if group is None:
+            return self.rows[:0]
+        return self.rows[self.offsets[group]:self.offsets[group + 1]]
+
+    def module_rows(self, modules):
+        # Filas de anotación de los módulos de un frame con las columnas de key_columns
+        # (un módulo por fila, en el orden de sus filas)
+        parts = [self.get(*key) for key in zip(*(modules[column].to_numpy() for column in self.key_columns))]
+        return np.concatenate(parts) if parts else self.rows[:0]
+
+    @property
+    def nbytes(self):
+        return self.rows.nbytes + self.offsets.nbytes
+
+
+class FacetTree:
+    # Tipo celular -> cluster -> iteración, con el número de filas (gen en módulo) de cada
+    # faceta. Se construye una vez y responde a los desplegables de filtros sin recorrer las redes.
+
+    def __init__(self, modules):
+        self.tree = {}
+        counts = modules.groupby(["cell_type", "subcluster", "iteration"], observed=True, sort=True).size()
+        for (cell_type, cluster, iteration), count in counts.items():
+            clusters = self.tree.setdefault(cell_type, {})
+            clusters.setdefault(str(cluster), {"cluster": cluster, "iterations": {}})["iterations"][iteration] = int(count)
+
+    def clusters(self, cell_type):
+        return sorted(node["cluster"] for node in self.tree.get(cell_type, {}).values())
+
+    def iterations(self, cell_type, cluster=None):
+        return sorted(self.iteration_counts(cell_type, cluster))
+
+    def cluster_counts(self, cell_type):
+        return {node["cluster"]: sum(node["iterations"].values()) for node in self.tree.get(cell_type, {}).values()}
+
+    def iteration_counts(self, cell_type, cluster=None):
+        clusters = self.tree.get(cell_type, {})
+        nodes = clusters.values() if cluster is None else [clusters.get(str(cluster), {"iterations": {}})]
+        counts = {}
+        for node in nodes:
+            for iteration, count in node["iterations"].items():
+                if iteration:
+                    counts[iteration] = counts.get(iteration, 0) + count
+        return counts
+
+
+def finite_ic(values):
+    # IC infinito -> máximo IC finito + 10, como en el resto de la API. Devuelve (IC, sustituto)
+    ic = pd.to_numeric(values, errors="coerce").to_numpy(dtype=float)
+    finite = ic[np.isfinite(ic)]
+    replacement_ic = finite.max() + 10 if len(finite) else 0
+    return np.where(np.isposinf(ic), replacement_ic, ic), replacement_ic
+
+class ExclusiveTermIndex:
+    # Términos GO que solo aparecen en un tipo celular ("Microglia 19") y, para cada tipo
+    # celular, las filas de esos términos (ordenadas por p-value) con sus estadísticas.
+
+    def __init__(self, annotations, labels):
+        term_codes, terms = pd.factorize(annotations["term_id"], use_na_sentinel=False)
+        label_codes, label_names = pd.factorize(labels)
+        n_labels = max(len(label_names), 1)
+
+        # término -> tipos celulares en los que aparece
+        pairs = np.unique(term_codes.astype(np.int64) * n_labels + label_codes)
+        pair_terms, pair_labels = np.divmod(pairs, n_labels)
+        self.term_labels = {terms[term]: set() for term in np.unique(pair_terms)}
+        for term, label in zip(pair_terms, pair_labels):
+            self.term_labels[terms[term]].add(label_names[label])
+        exclusive = np.bincount(pair_terms, minlength=len(terms)) == 1
+
+        ic, self.replacement_ic = finite_ic(annotations["IC"])
+        p_values = pd.to_numeric(annotations["p_value"], errors="coerce").to_numpy(dtype=float)
+        sizes = pd.to_numeric(annotations["length_intersection"], errors="coerce").to_numpy(dtype=float)
+        term_pairs = pd.MultiIndex.from_arrays([annotations["term_id"], annotations["term_name"]])
+
+        self.rows = {}
+        self.stats = {}
+        for label_code, label in enumerate(label_names):
+            label_rows = np.flatnonzero(label_codes == label_code)
+            unique_pairs = term_pairs[label_rows].unique()
+            rows = label_rows[exclusive[term_codes[label_rows]]]
+            rows = rows[np.argsort(p_values[rows], kind="stable")]
+            exclusive_count = int(np.isin(unique_pairs.get_level_values(0), terms[exclusive]).sum())
+            positive_p = p_values[rows][p_values[rows] > 0]
+            valid_sizes = sizes[rows][~np.isnan(sizes[rows])]
+            self.rows[label] = rows
+            self.stats[label] = {
+                "exclusive_count": exclusive_count,
+                "exclusive_percentage": exclusive_count / len(unique_pairs) * 100 if len(unique_pairs) else 0.0,
+                "mean_neg_log_pvalue": float(np.mean(-np.log10(positive_p))) if len(positive_p) else 0.0,
+                "mean_intersection_size": float(np.mean(np.trunc(valid_sizes))) if len(valid_sizes) else 0.0,
+                "mean_ic": float(np.mean(ic[rows])) if len(rows) else 0.0,
+            }
+
+    def get(self, label):
+        # (filas exclusivas, estadísticas) del tipo celular o None si no tiene anotaciones
+        if label not in self.rows:
+            return None
+        return self.rows[label], self.stats[label]
+
+
+def normalize_cell_type_label(label):
+    # "T_cells 18" -> "T cells 18", como se muestra en la web
+    return label.replace("_", " ").strip()
+
+def popcount_rows(masks):
+    # Bits a 1 de cada fila; np.bitwise_count solo existe desde numpy 2
+    if hasattr(np, "bitwise_count"):
+        return np.bitwise_count(masks).sum(axis=1)
+    return np.unpackbits(masks.view(np.uint8), axis=1).sum(axis=1)
+
+class CellTypeMaskIndex:
+    # Estadísticas por gen ("Cell Types" = "a; b; c") como máscara de bits gen x tipo celular:
+    # bit j de masks[g] <=> el gen g aparece en cell_types[j]. Exclusivo de X <=> solo el bit de X.
+
+    def __init__(self, stats):
+        stats = stats.reset_index(drop=True)
+        genes = stats["Gene"].astype(str).to_numpy()
+        labels = stats["Cell Types"].astype(object).fillna("").astype(str).str.split("; ").explode()
+        labels = labels.map(normalize_cell_type_label)
+        labels = labels[labels != ""]
+        label_codes, cell_types = pd.factorize(labels, sort=True)
+        gene_codes, gene_names = pd.factorize(genes, sort=True)
+
+        self.genes = np.array([sys.intern(gene) for gene in gene_names], dtype=object)
+        self.cell_types = list(cell_types)
+        self.cell_type_ids = {cell_type: i for i, cell_type in enumerate(self.cell_types)}
+        # Palabras de 64 bits por gen; un gen repetido en varias filas acumula sus bits
+        n_words = max((len(self.cell_types) + 63) // 64, 1)
+        self.masks = np.zeros((len(self.genes), n_words), dtype=np.uint64)
+        rows = gene_codes[labels.index.to_numpy()]
+        bits = np.left_shift(np.uint64(1), (label_codes % 64).astype(np.uint64))
+        np.bitwise_or.at(self.masks, (rows, label_codes // 64), bits)
+        self.popcount = popcount_rows(self.masks)
+
+    def bit(self, cell_type):
+        # (palabra, máscara) del tipo celular o None si no aparece en el fichero
+        cell_type_id = self.cell_type_ids.get(normalize_cell_type_label(cell_type))
+        if cell_type_id is None:
+            return None
+        return cell_type_id // 64, np.uint64(1) << np.uint64(cell_type_id % 64)
+
+    def genes_in(self, cell_type):
+        # Genes presentes en el tipo celular (coincidencia exacta de la etiqueta)
+        bit = self.bit(cell_type)
+        if bit is None:
+            return self.genes[:0]
+        word, mask = bit
+        return self.genes[(self.masks[:, word] & mask) != 0]
+
+    def exclusive_genes(self, cell_type):
+        bit = self.bit(cell_type)
+        if bit is None:
+            return self.genes[:0]
+        word, mask = bit
+        return self.genes[(self.popcount == 1) & ((self.masks[:, word] & mask) != 0)]
+
+    def summary(self):
+        # Para todos los tipos celulares a la vez: genes presentes y genes exclusivos
+        n_cell_types = len(self.cell_types)
+        totals = np.zeros(n_cell_types, dtype=np.int64)
+        for word in range(self.masks.shape[1]):
+            width = min(64, n_cell_types - word * 64)
+            shifts = np.arange(width, dtype=np.uint64)
+            present = (self.masks[:, word, None] >> shifts) & np.uint64(1)
+            totals[word * 64:word * 64 + width] = present.sum(axis=0)
+        single = self.popcount == 1
+        # El único bit encendido de cada gen exclusivo: log2 de la máscara
+        words = np.argmax(self.masks[single] != 0, axis=1)
+        values = self.masks[single][np.arange(len(words)), words]
+        exclusive_ids = words * 64 + np.log2(values.astype(np.float64)).astype(np.int64)
+        exclusive = np.bincount(exclusive_ids, minlength=n_cell_types)
+        return pd.DataFrame({
+            "cell_type": self.cell_types,
+            "genes": totals,
+            "exclusive_genes": exclusive,
+            "exclusive_percentage": np.divide(exclusive * 100.0, totals, out=np.zeros(n_cell_types), where=totals > 0),
+        })
+
+    @property
+    def nbytes(self):
+        return self.masks.nbytes + self.popcount.nbytes
@@ -0,0 +1,108 @@
+import sys
+import threading
+from collections import OrderedDict
+
+import pandas as pd
+
+# Caché de resultados de consultas con límite en bytes y expulsión LRU. Las claves se
+# normalizan (ruta, origen de datos, término, filtros) para que búsquedas equivalentes
+# compartan entrada, y todo se invalida al cambiar la versión de los datos.
+
+
+def normalize_filters(filters):
+    # Lista de filtros compilados -> tupla ordenada y hashable
+    normalized = []
+    for column, kind, values in filters:
+        if kind == "contains":
+            values = values.pattern.lower()
+        elif isinstance(values, (set, frozenset)):
+            values = tuple(sorted(values))
+        normalized.append((column, kind, values))
+    return tuple(sorted(normalized, key=repr))
+
+def normalize_params(params, upper=()):
+    # Parámetros de un formulario -> tupla ordenada sin los vacíos; los de upper sin distinguir mayúsculas
+    items = []
+    for key in sorted(set(params.keys())):
+        value = (params.get(key) or "").strip()
+        if value:
+            items.append((key, value.upper() if key in upper else value))
+    return tuple(items)
+
+def value_size(value):
+    # Bytes aproximados de un resultado: frames por memory_usage, páginas por longitud
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(index=True, deep=True).sum())
+    frame = getattr(value, "frame", None)
+    if isinstance(frame, pd.DataFrame):
+        return int(frame.memory_usage(index=True, deep=True).sum())
+    if isinstance(value, str):
+        return len(value.encode())
+    if isinstance(value, bytes):
+        return len(value)
+    return sys.getsizeof(value)
+
+
+class QueryCache:
+
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()
+        self.bytes = 0
+        self.version = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.lock = threading.Lock()
+
+    def get_or_compute(self, version, key, compute, cacheable=None):
+        # cacheable(value) decide si se guarda el resultado (p.ej. no guardar respuestas de error)
+        with self.lock:
+            if version > self.version:
+                # Datos recargados: ninguna entrada anterior es válida
+                self.entries.clear()
+                self.bytes = 0
+                self.version = version
+            elif version < self.version:
+                # Petición que empezó con la instantánea anterior: no se cachea
+                return compute()
+            entry = self.entries.get(key)
+            if entry is not None:
+                self.entries.move_to_end(key)
+                self.hits += 1
+                return entry[0]
+            self.misses += 1
+
+        # Se calcula fuera del lock; dos peticiones iguales a la vez calculan las dos
+        value = compute()
+        size = value_size(value)
+        with self.lock:
+            if version != self.version or size > self.max_bytes or key in self.entries \
+                    or (cacheable is not None and not cacheable(value)):
+                return value
+            self.entries[key] = (value, size)
+            self.bytes += size
+            while self.bytes > self.max_bytes:
+                _, (_, evicted_size) = self.entries.popitem(last=False)
+                self.bytes -= evicted_size
+                self.evictions += 1
+        return value
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.bytes = 0
+
+    def stats(self):
+        with self.lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self.entries),
+                "bytes": self.bytes,
+                "max_bytes": self.max_bytes,
+                "version": self.version,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
@@ -0,0 +1,391 @@
+import hashlib
+import os
+import re
+import sys
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+from data_cache import load_predict_store, predict_files, predicts_signature, read_csv_cached
+from data_filters import apply_filters
+from data_gene_stats import GeneStats, build_gene_stats
+from data_indexes import (BULK_MODULE_KEYS, SUBGRAPH_KEYS, CellTypeMaskIndex, ExclusiveTermIndex, FacetTree,
+                          ModuleAnnotationIndex, build_gene_index, build_gene_prefix_index, build_intersection_index,
+                          finite_ic)
+from data_shared import shared_frame, sources_signature
+
+# Distintos ficheros
+annotations_file = "./data/final_subgraphs_preprocessed_IC.csv"
+modules_dir = "./scCoExpNets-master/inst/data/networks/"
+
+bulk_annotations_file = "./data/APP_ROSMAP_TGCNs_annotations.csv"
+bulk_modules_file = "./data/APP_ROSMAP_TGCNs_modules.csv"
+
+minimally_expressed_file = "./data/Minimally_Expressed_Statistics.csv"
+relevant_at_t0_file = "./data/Relevant_At_T0_Statistics.csv"
+relevant_in_all_iterations_file = "./data/Relevant_In_All_Iterations_Statistics.csv"
+
+predicts_dirs = {
+    "scRNA": "./DistintosPredicts/Predicts/",
+    "p-value": "./DistintosPredicts/Predicts(p-value)/",
+    "bulk": "./DistintosPredicts/PredictsBulk/",
+}
+
+MODULE_COLUMNS = ["network", "iteration", "cell_type", "subcluster", "module", "module_size",
+                  "gene", "module_membership", "percentile"]
+
+# Columnas de las anotaciones (scRNA y bulk) con pocos valores distintos: se guardan como
+# categorías; los enteros pequeños caben en int32. Las métricas (p_value, IC) se quedan en
+# float64 porque se muestran y se descargan tal cual.
+ANNOTATION_CATEGORIES = ["cell_type", "iteration", "module", "source", "term_id", "term_name",
+                         "target", "tissue", "phenotype"]
+ANNOTATION_INT32 = ["cluster", "length_intersection", "subgraph_size", "cutoff"]
+
+# Se incrementa al cambiar el cálculo de gene_stats para no reutilizar la tabla publicada
+GENE_STATS_VERSION = 1
+
+
+def load_csv(file_path):
+    # Cargar un archivo CSV desde la ruta especificada (a través de la caché columnar).
+    return read_csv_cached(file_path)
+
+def extract_iteration(file_name):
+    match = re.search(r"_T(\d+)_", file_name)
+    return f"T{match.group(1)}" if match else ""
+
+def extract_cell_type(file_name):
+    # "DA_like_neurons_11_T0_modules.csv" -> "DA_like_neurons"
+    match = re.match(r"(.+?)_\d+_", file_name)
+    return match.group(1).replace("_", " ") if match else ""
+
+def network_files(data_dir):
+    if not os.path.isdir(data_dir):
+        return []
+    return sorted(file_name for file_name in os.listdir(data_dir) if file_name.endswith(".csv"))
+
+def source_files():
+    # Todos los CSV que alimentan el registro
+    return [os.path.join(modules_dir, file_name) for file_name in network_files(modules_dir)] + [
+        annotations_file, bulk_annotations_file, bulk_modules_file,
+        minimally_expressed_file, relevant_at_t0_file, relevant_in_all_iterations_file,
+    ]
+
+def compact_annotations(annotations):
+    if annotations is None:
+        return None
+    for col in ANNOTATION_INT32:
+        if col in annotations.columns and annotations[col].dtype.kind in "iu" and annotations[col].dtype != np.int32:
+            annotations[col] = annotations[col].astype(np.int32, copy=False)
+    for col in ANNOTATION_CATEGORIES:
+        # object en pandas 2, StringDtype en pandas 3
+        if col in annotations.columns and (pd.api.types.is_object_dtype(annotations[col].dtype)
+                                           or pd.api.types.is_string_dtype(annotations[col].dtype)):
+            annotations[col] = annotations[col].astype("category")
+    return annotations
+
+def cell_type_labels(annotations):
+    # "DA_like_neurons" + 11 -> "DA like neurons 11", la etiqueta que usan los filtros por tipo celular
+    if annotations is None:
+        return None
+    labels = annotations["cell_type"].astype(str).str.replace("_", " ") + " " + annotations["cluster"].astype(str)
+    return labels.astype("category")
+
+def load_modules(data_dir):
+    # Concatena todas las redes en un único frame; el tipo celular y la iteración salen del nombre del fichero
+    frames = []
+    for file_name in network_files(data_dir):
+        dataset = load_csv(os.path.join(data_dir, file_name))
+        if dataset is None or 'gene' not in dataset.columns:
+            continue
+        dataset["network"] = file_name
+        dataset["cell_type"] = extract_cell_type(file_name)
+        dataset["iteration"] = extract_iteration(file_name)
+        frames.append(dataset)
+    if not frames:
+        return pd.DataFrame(columns=MODULE_COLUMNS)
+    modules = pd.concat(frames, ignore_index=True)
+    return modules[MODULE_COLUMNS + [col for col in modules.columns if col not in MODULE_COLUMNS]]
+
+def predicted_functions(predicts):
+    # Anotaciones nuevas predichas por los módulos scRNA (suma de new_annotations, entera).
+    # "p-value" repite las mismas predicciones y bulk new_functions no es un recuento entero
+    store = predicts.get("scRNA")
+    if store is None or "new_annotations" not in store.table.columns:
+        return 0
+    column = store.table["new_annotations"]
+    if column.dtype.kind not in "iu":
+        return 0
+    return int(column.sum())
+
+
+class DatasetCatalog:
+    # Cifras globales de los datasets calculadas una vez por carga: contadores de la página de
+    # inicio, total de tipos celulares (tipo + cluster) y el IC que sustituye a los infinitos.
+
+    def __init__(self, registry):
+        annotations = registry.annotations
+        self.networks = len(registry.networks)
+        self.cell_types = sum(len(registry.facets.clusters(cell_type)) for cell_type in registry.facets.tree)
+        self.go_terms = 0 if annotations is None else int(annotations["term_id"].nunique())
+        self.annotations = 0 if annotations is None else len(annotations)
+        self.predicted_functions = predicted_functions(registry.predicts)
+        self.replacement_ic = 0 if annotations is None else finite_ic(annotations["IC"])[1]
+
+    def as_dict(self):
+        return {name: float(value) if isinstance(value, np.floating) else value for name, value in vars(self).items()}
+
+
+class DatasetRegistry:
+    # Todos los datasets de la API cargados una sola vez en memoria
+
+    def __init__(self, modules, annotations, bulk_modules, bulk_annotations,
+                 minimally_expressed, relevant_at_t0, relevant_in_all_iterations, predicts):
+        self.modules = modules
+        self.annotations = annotations
+        self.bulk_modules = bulk_modules
+        self.bulk_annotations = bulk_annotations
+        self.minimally_expressed = minimally_expressed
+        self.relevant_at_t0 = relevant_at_t0
+        self.relevant_in_all_iterations = relevant_in_all_iterations
+        self.predicts = predicts
+        # Los asigna RegistryHolder al publicar el registro
+        self.version = 0
+        self.signature = None
+        self.modified_at = None
+        self.networks = sorted(modules["network"].unique())
+        self.cell_types = sorted(set(extract_cell_type(name) for name in self.networks) - {""})
+        self.gene_index = build_gene_index(modules)
+        self.gene_prefixes = build_gene_prefix_index(self.gene_index)
+        self.bulk_gene_index = build_gene_index(bulk_modules) if bulk_modules is not None else {}
+        self.facets = FacetTree(modules)
+        self.intersection_index = build_intersection_index(annotations)
+        self.bulk_intersection_index = build_intersection_index(bulk_annotations)
+        self.module_annotations = ModuleAnnotationIndex(annotations)
+        self.bulk_module_annotations = ModuleAnnotationIndex(bulk_annotations, BULK_MODULE_KEYS)
+        self.subgraph_annotations = ModuleAnnotationIndex(annotations, SUBGRAPH_KEYS)
+        self.annotation_labels = cell_type_labels(annotations)
+        self.exclusive_terms = None if annotations is None else ExclusiveTermIndex(annotations, self.annotation_labels)
+        # Criterio de las estadísticas -> máscara gen x tipo celular
+        self.cell_type_masks = {
+            "minimally_expressed": CellTypeMaskIndex(minimally_expressed),
+            "relevant_at_t0": CellTypeMaskIndex(relevant_at_t0),
+            "relevant_in_all_iterations": CellTypeMaskIndex(relevant_in_all_iterations),
+        }
+        self.catalog = DatasetCatalog(self)
+        # Se añade en build_registry, una vez construidos los índices
+        self.gene_stats = GeneStats(pd.DataFrame())
+
+    def gene_rows(self, gene, data_source='scRNA'):
+        # Filas de todas las redes en las que aparece el gen, sin recorrer el frame completo
+        if data_source == 'scRNA':
+            modules, index = self.modules, self.gene_index
+        else:
+            modules, index = self.bulk_modules, self.bulk_gene_index
+        positions = index.get(gene)
+        if positions is None:
+            return modules.iloc[0:0]
+        return modules.take(positions)
+
+    def intersection_rows(self, gene, data_source='scRNA'):
+        # Posiciones de las anotaciones cuya intersección incluye el gen (coincidencia exacta)
+        index = self.intersection_index if data_source == 'scRNA' else self.bulk_intersection_index
+        return index.rows(gene.strip().upper())
+
+    def new_function_rows(self, gene, data_source='scRNA', filters=()):
+        # Anotaciones de los módulos del gen cuya intersección no lo incluye (anti-join con
+        # las posiciones del gen en el índice de intersecciones), en el orden de sus redes.
+        # filters restringe antes las redes del gen (p.ej. cutoff/target/tissue/phenotype en bulk).
+        gene_modules = apply_filters(self.gene_rows(gene, data_source), filters)
+        if data_source == 'scRNA':
+            # En las anotaciones el tipo celular lleva "_" y el cluster es la columna cluster
+            gene_modules = gene_modules.assign(cell_type=gene_modules["cell_type"].astype(str).str.replace(" ", "_"),
+                                               cluster=gene_modules["subcluster"])
+            index = self.module_annotations
+        else:
+            index = self.bulk_module_annotations
+        rows = index.module_rows(gene_modules)
+        return rows[~np.isin(rows, self.intersection_rows(gene, data_source))]
+
+    def subgraph_rows(self, subgraph_id):
+        # Posiciones de las anotaciones de un subgrafo; el id llega como texto aunque sea numérico
+        rows = self.subgraph_annotations.get(subgraph_id)
+        if not len(rows) and subgraph_id.lstrip("-").isdigit():
+            rows = self.subgraph_annotations.get(int(subgraph_id))
+        return rows
+
+    def predict_rows(self, gene, data_source='scRNA'):
+        # Predicciones del gen (mismo frame que su predict_<GEN>.csv) o None si no tiene fichero
+        return self.predicts[data_source].get(gene)
+
+    def gene_summary(self, gene):
+        # Estadísticas precalculadas del gen (tabla gene_stats) o None
+        return self.gene_stats.get(gene)
+
+
+def build_registry(progress=None):
+    # Las tablas se mapean desde segmentos compartidos: N workers leen una sola copia física.
+    # progress recibe el estado y el tiempo de carga de cada dataset a medida que avanza.
+    progress = {} if progress is None else progress
+
+    def timed(name, load):
+        progress[name] = {"status": "loading"}
+        start = time.perf_counter()
+        try:
+            value = load()
+        except Exception as e:
+            progress[name] = {"status": "error", "error": f"{type(e).__name__}: {e}",
+                              "seconds": round(time.perf_counter() - start, 3)}
+            raise
+        progress[name] = {"status": "missing" if value is None else "ready",
+                          "seconds": round(time.perf_counter() - start, 3)}
+        return value
+
+    def shared_csv(name, file_path):
+        return timed(name, lambda: shared_frame(name, sources_signature([file_path]),
+                                                lambda: load_csv(file_path)))
+
+    def shared_annotations(name, file_path):
+        # Se compactan antes de publicar el segmento: el frame mapeado ya tiene los tipos finales
+        return timed(name, lambda: shared_frame(name, sources_signature([file_path]),
+                                                lambda: compact_annotations(load_csv(file_path))))
+
+    module_files = [os.path.join(modules_dir, file_name) for file_name in network_files(modules_dir)]
+    datasets = dict(
+        modules=timed("modules", lambda: shared_frame("modules", sources_signature(module_files),
+                                                      lambda: load_modules(modules_dir))),
+        annotations=shared_annotations("annotations", annotations_file),
+        bulk_modules=shared_csv("bulk_modules", bulk_modules_file),
+        bulk_annotations=shared_annotations("bulk_annotations", bulk_annotations_file),
+        minimally_expressed=shared_csv("minimally_expressed", minimally_expressed_file),
+        relevant_at_t0=shared_csv("relevant_at_t0", relevant_at_t0_file),
+        relevant_in_all_iterations=shared_csv("relevant_in_all_iterations", relevant_in_all_iterations_file),
+        predicts={name: timed(f"predicts_{name}", lambda path=path: load_predict_store(path))
+                  for name, path in predicts_dirs.items()},
+    )
+    registry = timed("indexes", lambda: DatasetRegistry(**datasets))
+    gene_stats_signature = hashlib.sha256("".join([
+        f"v{GENE_STATS_VERSION}",
+        sources_signature(module_files + [annotations_file, minimally_expressed_file]),
+        datasets["predicts"]["scRNA"].signature or "",
+    ]).encode()).hexdigest()
+    registry.gene_stats = GeneStats(timed("gene_stats", lambda: shared_frame(
+        "gene_stats", gene_stats_signature, lambda: build_gene_stats(registry))))
+    return registry
+
+def data_signature():
+    # Cambia en cuanto se modifica, añade o borra cualquier fichero de datos
+    return sources_signature(source_files()) + "".join(
+        predicts_signature(predict_files(path)) for path in predicts_dirs.values()
+    )
+
+def data_modified_at():
+    # Última modificación de los ficheros de datos; igual en todos los procesos (Last-Modified)
+    mtimes = [os.stat(path).st_mtime for path in source_files() if os.path.exists(path)]
+    for path in predicts_dirs.values():
+        mtimes.extend(entry.stat().st_mtime for entry in predict_files(path).values())
+    return max(mtimes, default=None)
+
+
+class RegistryHolder:
+    # Instantánea vigente del registro. La primera carga se hace en segundo plano (warm_up)
+    # o, si no se ha lanzado, en la primera petición. Una recarga construye un registro nuevo
+    # y lo sustituye de una vez; las peticiones en curso terminan con el anterior.
+
+    def __init__(self):
+        self.current = None
+        self.signature = None
+        self.version = 0
+        self.loaded_at = None
+        self.last_error = None
+        self.datasets = {}
+        self.lock = threading.Lock()
+
+    def reload(self, force=False):
+        with self.lock:
+            signature = data_signature()
+            if self.current is not None and signature == self.signature and not force:
+                return False
+            self.datasets = {}
+            try:
+                registry = build_registry(self.datasets)
+            except Exception as e:
+                # Si falla la recarga se sigue sirviendo la instantánea anterior
+                self.last_error = f"{type(e).__name__}: {e}"
+                print(f"Error loading data: {self.last_error}")
+                return False
+            self.version += 1
+            registry.version = self.version
+            registry.signature = signature
+            registry.modified_at = data_modified_at()
+            self.current = registry
+            self.signature = signature
+            self.loaded_at = time.time()
+            self.last_error = None
+            return True
+
+    def reload_in_background(self, force=False):
+        if self.lock.locked():
+            return False
+        threading.Thread(target=self.reload, kwargs={"force": force}, daemon=True).start()
+        return True
+
+    def warm_up(self):
+        # Carga inicial sin bloquear el arranque del servidor
+        return self.reload_in_background()
+
+    def get(self):
+        if self.current is None:
+            # Espera a la carga en curso o la hace él mismo
+            self.reload()
+            if self.current is None:
+                raise RuntimeError(f"Data could not be loaded: {self.last_error}")
+        return self.current
+
+    def watch(self, interval):
+        # Comprueba periódicamente si han cambiado los ficheros de datos
+        def poll():
+            while True:
+                time.sleep(interval)
+                self.reload()
+        threading.Thread(target=poll, daemon=True).start()
+
+    def status(self):
+        return {
+            "ready": self.current is not None,
+            "version": self.version,
+            "loaded_at": None if self.loaded_at is None else
+                time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(self.loaded_at)),
+            "reloading": self.lock.locked(),
+            "last_error": self.last_error,
+            "datasets": self.datasets,
+            "catalog": None if self.current is None else self.current.catalog.as_dict(),
+        }
+
+
+def memory_report(registry):
+    # Bytes por columna de las anotaciones tal como salen del CSV frente a la versión compacta;
+    # el índice de intersecciones se compara con el antiguo dict gen -> array int64
+    rows = []
+    tables = [("annotations", annotations_file, registry.annotations, registry.intersection_index),
+              ("bulk_annotations", bulk_annotations_file, registry.bulk_annotations, registry.bulk_intersection_index)]
+    for name, file_path, compact, index in tables:
+        raw = load_csv(file_path)
+        if raw is None or compact is None:
+            continue
+        before = raw.memory_usage(deep=True, index=False)
+        after = compact.memory_usage(deep=True, index=False)
+        rows += [(name, col, before[col], after[col]) for col in raw.columns]
+        dict_bytes = sys.getsizeof(index.gene_ids) + sum(
+            sys.getsizeof(gene) + index.rows(gene).astype(np.int64).nbytes + 112 for gene in index.genes)
+        rows.append((name, "intersection index", dict_bytes, index.nbytes))
+    report = pd.DataFrame(rows, columns=["table", "column", "bytes_before", "bytes_after"])
+    totals = report.groupby("table", sort=False)[["bytes_before", "bytes_after"]].sum().reset_index()
+    totals["column"] = "TOTAL"
+    return pd.concat([report, totals[report.columns]], ignore_index=True)
+
+
+if __name__ == "__main__":
+    # python code/data_registry.py desde la raíz del repo
+    print(memory_report(build_registry()).to_string(index=False))
@@ -0,0 +1,79 @@
+import numpy as np
+import pandas as pd
+
+
+def top_k_order(keys, k):
+    # Posiciones de las k claves menores en el mismo orden que un argsort estable (NaN al final).
+    # argpartition fija el umbral; los empates en el umbral se resuelven por posición.
+    n = len(keys)
+    if k >= n:
+        return np.argsort(keys, kind="stable")
+    if k <= 0:
+        return np.empty(0, dtype=np.int64)
+    valid = np.flatnonzero(~np.isnan(keys))
+    if k >= len(valid):
+        return np.concatenate([valid[np.argsort(keys[valid], kind="stable")],
+                               np.flatnonzero(np.isnan(keys))])[:k]
+    threshold = keys[valid[np.argpartition(keys[valid], k - 1)[k - 1]]]
+    below = np.flatnonzero(keys < threshold)
+    ties = np.flatnonzero(keys == threshold)[:k - len(below)]
+    candidates = np.union1d(below, ties)
+    return candidates[np.argsort(keys[candidates], kind="stable")]
+
+
+class ResultSet:
+    # Resultado de una consulta con los valores sin formatear. Se ordena y se recorta sobre
+    # los valores reales y solo se formatean las filas que se muestran o se exportan.
+    # columns: [(cabecera, columna del frame, formateador o None)]
+
+    def __init__(self, frame, columns):
+        self.frame = frame.reset_index(drop=True)
+        self.columns = columns
+
+    def __len__(self):
+        return len(self.frame)
+
+    def __iter__(self):
+        return iter(self.records())
+
+    @property
+    def headers(self):
+        return [header for header, _, _ in self.columns]
+
+    def sort_by(self, column, ascending=True):
+        # argsort estable sobre los floats; los NaN quedan siempre al final
+        values = pd.to_numeric(self.frame[column], errors="coerce").to_numpy(dtype=float)
+        order = np.argsort(values if ascending else -values, kind="stable")
+        return ResultSet(self.frame.take(order), self.columns)
+
+    def top_k(self, column, k, ascending=True):
+        # Las k primeras filas de sort_by(column, ascending), sin ordenar el resto
+        values = pd.to_numeric(self.frame[column], errors="coerce").to_numpy(dtype=float)
+        return ResultSet(self.frame.take(top_k_order(values if ascending else -values, k)), self.columns)
+
+    def page(self, page, limit, column, ascending=True):
+        # Página (desde 1) de limit filas según column; solo se seleccionan page * limit filas
+        start = (page - 1) * limit
+        return self.top_k(column, start + limit, ascending).slice(start)
+
+    def slice(self, start, stop=None):
+        return ResultSet(self.frame.iloc[start:stop], self.columns)
+
+    def formatted_columns(self):
+        n_rows = len(self.frame)
+        formatted = []
+        for header, column, formatter in self.columns:
+            values = self.frame[column].tolist() if column in self.frame.columns else [""] * n_rows
+            formatted.append((header, values if formatter is None else [formatter(value) for value in values]))
+        return formatted
+
+    def records(self):
+        formatted = self.formatted_columns()
+        return [{header: values[i] for header, values in formatted} for i in range(len(self.frame))]
+
+    def rows(self):
+        # Celdas de cada fila en el orden de columns, como las pinta macros.table_body
+        return [list(cells) for cells in zip(*(values for _, values in self.formatted_columns()))]
+
+    def to_frame(self):
+        return pd.DataFrame(self.records())
@@ -0,0 +1,113 @@
+import hashlib
+import json
+import os
+import shutil
+import sys
+
+import numpy as np
+import pandas as pd
+
+# Segmentos de solo lectura compartidos entre workers a través de la caché de páginas:
+# cada columna numérica es un .npy mapeado en memoria; las de texto se guardan como
+# códigos int32 (mapeados) más la lista de valores distintos.
+shared_dir = "./data/cache/shared/"
+# Se incrementa al cambiar el formato de los segmentos para no mapear los antiguos
+SEGMENT_FORMAT = 3
+
+
+def sources_signature(paths):
+    digest = hashlib.sha256()
+    for path in paths:
+        try:
+            stat = os.stat(path)
+            digest.update(f"{path}:{stat.st_size}:{stat.st_mtime_ns};".encode())
+        except OSError:
+            digest.update(f"{path}:missing;".encode())
+    return digest.hexdigest()
+
+def segment_path(name, signature):
+    return os.path.join(shared_dir, f"{name}-{signature[:16]}v{SEGMENT_FORMAT}")
+
+def code_dtype(n_values):
+    # El mismo tipo de códigos que elige pandas para un Categorical: con otro lo copiaría al mapearlo
+    for dtype in (np.int8, np.int16, np.int32):
+        if n_values < np.iinfo(dtype).max:
+            return dtype
+    return np.int64
+
+def column_kind(series):
+    if series.dtype.kind in "biuf":
+        return "numeric"
+    # object (pandas 2), StringDtype (por defecto en pandas 3) o categorías de texto
+    textual = pd.api.types.is_object_dtype(series.dtype) or pd.api.types.is_string_dtype(series.dtype) \
+        or isinstance(series.dtype, pd.CategoricalDtype)
+    if textual and pd.api.types.infer_dtype(series, skipna=True) in ("string", "empty", "categorical"):
+        return "strings"
+    return None
+
+def write_segment(name, signature, df):
+    final_path = segment_path(name, signature)
+    tmp_path = f"{final_path}.{os.getpid()}.tmp"
+    os.makedirs(tmp_path, exist_ok=True)
+    columns = []
+    for i, col in enumerate(df.columns):
+        kind = column_kind(df[col])
+        if kind == "numeric":
+            np.save(os.path.join(tmp_path, f"{i}.npy"), df[col].to_numpy())
+        else:
+            # Valores ordenados: los códigos respetan el orden alfabético
+            codes, values = pd.factorize(df[col], sort=True)
+            np.save(os.path.join(tmp_path, f"{i}.npy"), codes.astype(code_dtype(len(values))))
+            with open(os.path.join(tmp_path, f"{i}.json"), "w") as handle:
+                json.dump(list(values), handle)
+        columns.append({"name": col, "kind": kind})
+    with open(os.path.join(tmp_path, "meta.json"), "w") as handle:
+        json.dump({"signature": signature, "rows": len(df), "columns": columns}, handle)
+    try:
+        os.replace(tmp_path, final_path)
+    except OSError:
+        # Otro worker publicó el mismo segmento antes que nosotros
+        shutil.rmtree(tmp_path, ignore_errors=True)
+    # Versiones antiguas: los workers que aún las tengan mapeadas conservan sus páginas
+    for entry in os.listdir(shared_dir):
+        if entry.startswith(f"{name}-") and not entry.endswith(".tmp") \
+                and os.path.join(shared_dir, entry) != final_path:
+            shutil.rmtree(os.path.join(shared_dir, entry), ignore_errors=True)
+
+def map_frame(name, signature):
+    # DataFrame cuyas columnas apuntan directamente al segmento compartido: las numéricas son el
+    # array mapeado y las de texto un Categorical sobre los códigos int32 mapeados, de modo que
+    # ningún worker tiene una copia privada de las filas
+    path = segment_path(name, signature)
+    try:
+        with open(os.path.join(path, "meta.json")) as handle:
+            meta = json.load(handle)
+        data = {}
+        for i, column in enumerate(meta["columns"]):
+            array = np.asarray(np.load(os.path.join(path, f"{i}.npy"), mmap_mode="r"))
+            if column["kind"] == "strings":
+                with open(os.path.join(path, f"{i}.json")) as handle:
+                    values = [sys.intern(value) if isinstance(value, str) else value for value in json.load(handle)]
+                array = pd.Categorical.from_codes(array, categories=values)
+            data[column["name"]] = array
+    except (OSError, ValueError, KeyError):
+        return None
+    return pd.DataFrame(data, columns=[column["name"] for column in meta["columns"]], copy=False)
+
+def shared_frame(name, signature, load):
+    # Mapea el segmento si ya existe; si no, carga el frame, lo publica y lo mapea
+    df = map_frame(name, signature)
+    if df is not None:
+        return df
+    df = load()
+    if df is None or not isinstance(df.index, pd.RangeIndex) or df.index.start != 0 \
+            or any(column_kind(df[col]) is None for col in df.columns):
+        return df
+    try:
+        os.makedirs(shared_dir, exist_ok=True)
+        write_segment(name, signature, df)
+    except (OSError, ValueError) as e:
+        print(f"Error writing shared segment {name}: {e}")
+        return df
+    mapped = map_frame(name, signature)
+    return df if mapped is None else mapped
@@ -1,11 +1,21 @@
 console.log("toggle_subgraph.js cargado correctamente");
 
-// Funciones de debug
-if (!Array.isArray(fullData)) {
-    console.error("fullData no es un array:", fullData);
-    fullData = []; 
-}
-console.log("fullData:", fullData);
+// Miembros de cada subgrafo ya pedidos a /api/subgraph
+const subgraphCache = new Map();
+
+const fetchSubgraph = (subgraphId) => {
+    if (!subgraphCache.has(subgraphId)) {
+        const request = fetch(`/api/subgraph?subgraph_id=${encodeURIComponent(subgraphId)}`)
+            .then(response => response.ok ? response.json() : [])
+            .catch(error => {
+                console.error("Error al cargar el subgrafo:", error);
+                subgraphCache.delete(subgraphId);
+                return [];
+            });
+        subgraphCache.set(subgraphId, request);
+    }
+    return subgraphCache.get(subgraphId);
+};
 
 const formatIntersection = (intersection) => {
     if (!intersection) return '';
@@ -28,7 +38,7 @@ document.addEventListener('DOMContentLoaded', () => {
     document.querySelectorAll('.toggle-subgraph').forEach(button => {
         console.log("Botón encontrado:", button);
 
-        button.addEventListener('click', () => {
+        button.addEventListener('click', async () => {
             console.log("Botón clickeado:", button);
 
             const subgraphId = button.getAttribute('data-subgraph');
@@ -62,7 +72,9 @@ document.addEventListener('DOMContentLoaded', () => {
                     }
                 }
 
-                const matchingRows = fullData.filter(row => row["subgraph_id"] === subgraphId);
+                button.disabled = true;
+                const matchingRows = await fetchSubgraph(subgraphId);
+                button.disabled = false;
                 console.log("Filas coincidentes:", matchingRows);
 
                 if (matchingRows.length > 0) {